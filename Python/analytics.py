@@ -0,0 +1,130 @@
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from history import FIELD_STATUS, STATUS_CODES, Columns, TaskHistory
+
+IN_PROGRESS = STATUS_CODES["in_progress"]
+DONE = STATUS_CODES["done"]
+WEEK_SECONDS = 7 * 24 * 3600
+
+# Времена задачи по истории: создание, первое и последнее начало работы, завершение
+TaskTimes = Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]
+
+
+def task_times(columns: Columns) -> TaskTimes:
+    """Возвращает (создание, начало работы, возврат в работу, завершение) задачи.
+
+    Начало - первый переход в in_progress, возврат - последний, завершение -
+    последний переход в done, если после него задача не открывалась снова.
+    """
+    created = started = resumed = last_time = None
+    last_status = None
+    for timestamp, field, value in zip(*columns):
+        if field != FIELD_STATUS:
+            continue
+        if created is None:
+            created = timestamp
+        if value == IN_PROGRESS:
+            if started is None:
+                started = timestamp
+            resumed = timestamp
+        last_status, last_time = value, timestamp
+    return created, started, resumed, last_time if last_status == DONE else None
+
+
+def collect_times(history: TaskHistory, tasks: Iterable) -> Dict[int, TaskTimes]:
+    """Считает времена всех задач один раз для всех отчетов"""
+    times = {}
+    for task in tasks:
+        columns = history.columns.get(task.id)
+        if columns is not None:
+            times[task.id] = task_times(columns)
+    return times
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Процентиль по методу ближайшего ранга"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def cycle_time_stats(times: Dict[int, TaskTimes], tasks: Iterable, group_by: str = "priority") -> Dict[str, dict]:
+    """Считает медиану и p90 времени выполнения по приоритетам или тегам.
+
+    lead - от создания до завершения, cycle - от начала работы до завершения.
+    """
+    lead_times: Dict[str, List[int]] = {}
+    cycle_times: Dict[str, List[int]] = {}
+
+    for task in tasks:
+        if task.id not in times:
+            continue
+        created, started, _, finished = times[task.id]
+        if finished is None:
+            continue
+
+        groups = task.tags if group_by == "tag" else [task.priority]
+        for group in groups:
+            lead_times.setdefault(group, []).append(finished - created)
+            if started is not None and started <= finished:
+                cycle_times.setdefault(group, []).append(finished - started)
+
+    stats = {}
+    for group, leads in lead_times.items():
+        cycles = cycle_times.get(group, [])
+        stats[group] = {
+            "count": len(leads),
+            "lead_median": percentile(leads, 50),
+            "lead_p90": percentile(leads, 90),
+            "cycle_median": percentile(cycles, 50) if cycles else None,
+            "cycle_p90": percentile(cycles, 90) if cycles else None
+        }
+    return stats
+
+
+def weekly_throughput(times: Dict[int, TaskTimes], weeks: int = 8,
+                      now: Optional[datetime] = None) -> List[Tuple[datetime, int]]:
+    """Считает количество завершенных задач по неделям (с понедельника)"""
+    now = now or datetime.now()
+    week_start = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    first_week = int(week_start.timestamp()) - (weeks - 1) * WEEK_SECONDS
+
+    counts = [0] * weeks
+    for _, _, _, finished in times.values():
+        if finished is not None and finished >= first_week:
+            week = (finished - first_week) // WEEK_SECONDS
+            if week < weeks:
+                counts[week] += 1
+
+    return [(week_start - timedelta(weeks=weeks - 1 - i), count) for i, count in enumerate(counts)]
+
+
+def wip_ages(times: Dict[int, TaskTimes], tasks: Iterable, now: Optional[datetime] = None) -> List[Tuple[object, int]]:
+    """Возвращает задачи в работе и время с начала работы, самые старые первыми"""
+    now_ts = int((now or datetime.now()).timestamp())
+    ages = []
+    for task in tasks:
+        if task.status != "in_progress":
+            continue
+        # Последний переход в in_progress: задачу могли возвращать в работу
+        resumed = times[task.id][2] if task.id in times else None
+        if resumed is None:
+            resumed = int(task.updated_at.timestamp())
+        ages.append((task, now_ts - resumed))
+    ages.sort(key=lambda item: item[1], reverse=True)
+    return ages
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Форматирует длительность в виде '2д 5ч' или '40м'"""
+    if seconds is None:
+        return "—"
+    seconds = int(seconds)
+    days, rest = divmod(seconds, 24 * 3600)
+    hours, rest = divmod(rest, 3600)
+    if days:
+        return f"{days}д {hours}ч"
+    if hours:
+        return f"{hours}ч {rest // 60}м"
+    return f"{rest // 60}м"
@@ -0,0 +1,134 @@
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+from task import Task
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def archive_dirname(filename: str) -> str:
+    """Возвращает каталог архива для файла задач (tasks.json -> tasks.archive)"""
+    return os.path.splitext(filename)[0] + ".archive"
+
+
+class Archive:
+    """Архив выполненных задач.
+
+    Задачи хранятся в сегментах: каждый перенос в архив пишет новый файл
+    (по умолчанию сжатый gzip). Манифест хранит ID задач каждого сегмента,
+    поэтому сами сегменты читаются только по требованию.
+    """
+
+    def __init__(self, dirname: str, compress: bool = True):
+        self.dirname = dirname
+        self.compress = compress
+        self._manifest: Optional[dict] = None
+        self._tasks: Optional[List[Task]] = None
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.dirname, MANIFEST_FILENAME)
+
+    def manifest(self) -> dict:
+        """Возвращает манифест архива, читая его при первом обращении"""
+        if self._manifest is None:
+            try:
+                with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            except FileNotFoundError:
+                self._manifest = {"segments": []}
+        return self._manifest
+
+    def _save_manifest(self):
+        with open(self._manifest_path(), 'w', encoding='utf-8') as f:
+            json.dump(self.manifest(), f, ensure_ascii=False, indent=2)
+
+    def count(self) -> int:
+        """Возвращает количество задач в архиве"""
+        return sum(len(segment["ids"]) for segment in self.manifest()["segments"])
+
+    def max_id(self) -> int:
+        """Возвращает наибольший ID в архиве (0, если архив пуст)"""
+        return max((max(segment["ids"]) for segment in self.manifest()["segments"] if segment["ids"]),
+                   default=0)
+
+    def _read_segment(self, name: str) -> List[dict]:
+        path = os.path.join(self.dirname, name)
+        if name.endswith(".gz"):
+            import gzip
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)["tasks"]
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)["tasks"]
+
+    def _write_segment(self, name: str, tasks_data: List[dict]):
+        path = os.path.join(self.dirname, name)
+        data = {"tasks": tasks_data}
+        if name.endswith(".gz"):
+            import gzip
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def add_segment(self, tasks: List[Task]):
+        """Записывает задачи в новый сегмент"""
+        if not tasks:
+            return
+        os.makedirs(self.dirname, exist_ok=True)
+        segments = self.manifest()["segments"]
+        number = max((segment["number"] for segment in segments), default=0) + 1
+        name = f"segment_{number:06d}.json" + (".gz" if self.compress else "")
+
+        self._write_segment(name, [task.to_dict() for task in tasks])
+        segments.append({
+            "number": number,
+            "name": name,
+            "ids": sorted(task.id for task in tasks),
+            "archived_at": datetime.now().isoformat()
+        })
+        self._save_manifest()
+        if self._tasks is not None:
+            self._tasks.extend(tasks)
+
+    def load_tasks(self) -> List[Task]:
+        """Возвращает все задачи архива, загружая сегменты при первом обращении"""
+        if self._tasks is None:
+            self._tasks = []
+            for segment in self.manifest()["segments"]:
+                self._tasks.extend(Task.from_dict(data) for data in self._read_segment(segment["name"]))
+        return self._tasks
+
+    def read_task(self, task_id: int) -> Optional[dict]:
+        """Читает одну задачу, открывая только ее сегмент"""
+        for segment in self.manifest()["segments"]:
+            if task_id in segment["ids"]:
+                for data in self._read_segment(segment["name"]):
+                    if data["id"] == task_id:
+                        return data
+        return None
+
+    def remove_task(self, task_id: int) -> Optional[Task]:
+        """Извлекает задачу из архива, переписывая ее сегмент"""
+        segments = self.manifest()["segments"]
+        for segment in segments:
+            if task_id not in segment["ids"]:
+                continue
+
+            tasks_data = self._read_segment(segment["name"])
+            found = [data for data in tasks_data if data["id"] == task_id]
+            rest = [data for data in tasks_data if data["id"] != task_id]
+            if rest:
+                self._write_segment(segment["name"], rest)
+                segment["ids"] = [data["id"] for data in rest]
+            else:
+                os.remove(os.path.join(self.dirname, segment["name"]))
+                segments.remove(segment)
+            self._save_manifest()
+
+            if self._tasks is not None:
+                self._tasks = [task for task in self._tasks if task.id != task_id]
+            return Task.from_dict(found[0]) if found else None
+        return None
+
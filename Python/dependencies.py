@@ -0,0 +1,241 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+GRAPH_VERSION = 1
+
+
+def graph_filename(filename: str) -> str:
+    """Возвращает имя файла графа зависимостей для файла задач"""
+    return filename + ".deps"
+
+
+class DependencyGraph:
+    """Индекс связей между задачами.
+
+    Хранит ребра "блокирует / заблокирована" и "родитель / подзадача",
+    а также множества готовых (todo без незавершенных блокеров) и
+    заблокированных задач. Множества обновляются инкрементально при смене
+    статуса. Блокеры, которых нет в графе, считаются выполненными.
+    """
+
+    def __init__(self):
+        self.blocks: Dict[int, Set[int]] = {}
+        self.blocked_by: Dict[int, Set[int]] = {}
+        self.parents: Dict[int, int] = {}
+        self.children: Dict[int, Set[int]] = {}
+        self.statuses: Dict[int, str] = {}
+        self.pending: Dict[int, int] = {}
+        self.ready: Set[int] = set()
+        self.blocked: Set[int] = set()
+
+    @classmethod
+    def build(cls, tasks: Iterable) -> 'DependencyGraph':
+        """Строит граф по полям blocked_by и parent_id задач"""
+        graph = cls()
+        tasks = list(tasks)
+        for task in tasks:
+            graph.add_task(task.id, task.status)
+        for task in tasks:
+            for blocker_id in task.blocked_by:
+                graph._link(task.id, blocker_id)
+            if task.parent_id is not None:
+                graph.parents[task.id] = task.parent_id
+                graph.children.setdefault(task.parent_id, set()).add(task.id)
+        return graph
+
+    def _refresh(self, task_id: int):
+        self.ready.discard(task_id)
+        self.blocked.discard(task_id)
+        status = self.statuses.get(task_id)
+        if status is None or status == "done":
+            return
+        if self.pending.get(task_id, 0) > 0:
+            self.blocked.add(task_id)
+        elif status == "todo":
+            self.ready.add(task_id)
+
+    def _is_open(self, task_id: int) -> bool:
+        status = self.statuses.get(task_id)
+        return status is not None and status != "done"
+
+    def _link(self, task_id: int, blocker_id: int):
+        if blocker_id in self.blocked_by.setdefault(task_id, set()):
+            return
+        self.blocked_by[task_id].add(blocker_id)
+        self.blocks.setdefault(blocker_id, set()).add(task_id)
+        if self._is_open(blocker_id):
+            self.pending[task_id] = self.pending.get(task_id, 0) + 1
+        self._refresh(task_id)
+
+    def add_task(self, task_id: int, status: str):
+        """Добавляет задачу в граф"""
+        self.statuses[task_id] = status
+        # Задача могла упоминаться как блокер раньше, чем была добавлена
+        if status != "done":
+            for dependent_id in self.blocks.get(task_id, ()):
+                self.pending[dependent_id] = self.pending.get(dependent_id, 0) + 1
+                self._refresh(dependent_id)
+        self._refresh(task_id)
+
+    def remove_task(self, task_id: int):
+        """Удаляет задачу и все ее связи"""
+        self.set_status(task_id, "done")
+        for dependent_id in self.blocks.pop(task_id, set()):
+            self.blocked_by[dependent_id].discard(task_id)
+        for blocker_id in self.blocked_by.pop(task_id, set()):
+            self.blocks[blocker_id].discard(task_id)
+        parent_id = self.parents.pop(task_id, None)
+        if parent_id is not None:
+            self.children[parent_id].discard(task_id)
+        for child_id in self.children.pop(task_id, set()):
+            self.parents.pop(child_id, None)
+        self.statuses.pop(task_id, None)
+        self.pending.pop(task_id, None)
+        self.ready.discard(task_id)
+        self.blocked.discard(task_id)
+
+    def set_status(self, task_id: int, status: str):
+        """Обновляет статус задачи и готовность зависящих от нее задач"""
+        old_status = self.statuses.get(task_id)
+        if old_status is None or old_status == status:
+            return
+        self.statuses[task_id] = status
+
+        if (old_status == "done") != (status == "done"):
+            delta = -1 if status == "done" else 1
+            for dependent_id in self.blocks.get(task_id, ()):
+                self.pending[dependent_id] = self.pending.get(dependent_id, 0) + delta
+                self._refresh(dependent_id)
+        self._refresh(task_id)
+
+    def _reaches(self, start_id: int, target_id: int, edges: Dict[int, Set[int]]) -> bool:
+        stack = [start_id]
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current == target_id:
+                return True
+            if current in seen:
+                continue
+            seen.add(current)
+            stack.extend(edges.get(current, ()))
+        return False
+
+    def check_dependency(self, task_id: int, blocker_id: int):
+        """Проверяет, что ребро "blocker_id блокирует task_id" не создаст цикл"""
+        if self._reaches(task_id, blocker_id, self.blocks):
+            raise ValueError("Зависимость создаст цикл")
+
+    def add_dependency(self, task_id: int, blocker_id: int):
+        """Добавляет ребро "blocker_id блокирует task_id"; проверяет циклы"""
+        self.check_dependency(task_id, blocker_id)
+        self._link(task_id, blocker_id)
+
+    def remove_dependency(self, task_id: int, blocker_id: int):
+        """Удаляет ребро между блокером и задачей"""
+        if blocker_id not in self.blocked_by.get(task_id, set()):
+            return
+        self.blocked_by[task_id].discard(blocker_id)
+        self.blocks[blocker_id].discard(task_id)
+        if self._is_open(blocker_id):
+            self.pending[task_id] -= 1
+        self._refresh(task_id)
+
+    def check_parent(self, task_id: int, parent_id: Optional[int]):
+        """Проверяет, что родительская связь не создаст цикл"""
+        current = parent_id
+        while current is not None:
+            if current == task_id:
+                raise ValueError("Родительская связь создаст цикл")
+            current = self.parents.get(current)
+
+    def set_parent(self, task_id: int, parent_id: Optional[int]):
+        """Назначает родительскую задачу; проверяет циклы"""
+        self.check_parent(task_id, parent_id)
+
+        old_parent = self.parents.pop(task_id, None)
+        if old_parent is not None:
+            self.children[old_parent].discard(task_id)
+        if parent_id is not None:
+            self.parents[task_id] = parent_id
+            self.children.setdefault(parent_id, set()).add(task_id)
+
+    def chain(self, task_id: int) -> List[int]:
+        """Возвращает задачу и все ее блокеры в топологическом порядке"""
+        order: List[int] = []
+        visited: Set[int] = set()
+        # Итеративный обход в глубину: блокеры попадают в порядок раньше
+        stack = [(task_id, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if expanded:
+                order.append(current)
+                continue
+            if current in visited:
+                continue
+            visited.add(current)
+            stack.append((current, True))
+            for blocker_id in sorted(self.blocked_by.get(current, ()), reverse=True):
+                if blocker_id not in visited:
+                    stack.append((blocker_id, False))
+        return order
+
+    def to_dict(self) -> dict:
+        """Преобразует граф в словарь"""
+        return {
+            "blocked_by": {str(k): sorted(v) for k, v in self.blocked_by.items() if v},
+            "parents": {str(k): v for k, v in self.parents.items()},
+            "statuses": {str(k): v for k, v in self.statuses.items()},
+            "pending": {str(k): v for k, v in self.pending.items() if v},
+            "ready": sorted(self.ready),
+            "blocked": sorted(self.blocked)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DependencyGraph':
+        """Создает граф из словаря"""
+        graph = cls()
+        graph.statuses = {int(k): v for k, v in data["statuses"].items()}
+        for key, blocker_ids in data["blocked_by"].items():
+            graph.blocked_by[int(key)] = set(blocker_ids)
+            for blocker_id in blocker_ids:
+                graph.blocks.setdefault(blocker_id, set()).add(int(key))
+        for key, parent_id in data["parents"].items():
+            graph.parents[int(key)] = parent_id
+            graph.children.setdefault(parent_id, set()).add(int(key))
+        graph.pending = {int(k): v for k, v in data["pending"].items()}
+        graph.ready = set(data["ready"])
+        graph.blocked = set(data["blocked"])
+        return graph
+
+    def save(self, filename: str):
+        """Сохраняет граф рядом с файлом задач, привязывая его к его версии"""
+        stat = os.stat(filename)
+        data = {
+            "version": GRAPH_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "graph": self.to_dict()
+        }
+        with open(graph_filename(filename), 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    @classmethod
+    def open(cls, filename: str) -> Optional['DependencyGraph']:
+        """Загружает граф; возвращает None, если его нет или он устарел"""
+        try:
+            with open(graph_filename(filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            stat = os.stat(filename)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != GRAPH_VERSION:
+            return None
+        if data.get("size") != stat.st_size or data.get("mtime_ns") != stat.st_mtime_ns:
+            return None
+        try:
+            return cls.from_dict(data["graph"])
+        except (KeyError, TypeError, ValueError):
+            return None
@@ -0,0 +1,100 @@
+import os
+import struct
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Запись истории: ID задачи, время (секунды Unix), поле, код значения
+RECORD = struct.Struct('<IqBB')
+
+FIELD_STATUS = 0
+FIELD_PRIORITY = 1
+
+STATUS_CODES = {"todo": 0, "in_progress": 1, "done": 2}
+PRIORITY_CODES = {"low": 0, "medium": 1, "high": 2}
+FIELD_CODES = {FIELD_STATUS: STATUS_CODES, FIELD_PRIORITY: PRIORITY_CODES}
+
+# Столбцы истории одной задачи: время, поле, код значения
+Columns = Tuple[array, array, array]
+
+
+def history_filename(filename: str) -> str:
+    """Возвращает имя файла истории для файла задач"""
+    return filename + ".history"
+
+
+def pack_record(task_id: int, field: int, value: str, when: datetime) -> bytes:
+    """Упаковывает одно изменение в запись фиксированного размера"""
+    return RECORD.pack(task_id, int(when.timestamp()), field, FIELD_CODES[field][value])
+
+
+def append_records(filename: str, records: Iterable[bytes]):
+    """Дописывает упакованные записи в файл истории"""
+    data = b"".join(records)
+    if data:
+        with open(history_filename(filename), 'ab') as f:
+            f.write(data)
+
+
+class TaskHistory:
+    """Журнал изменений статуса и приоритета задач.
+
+    Файл только дописывается. В памяти история каждой задачи хранится
+    столбцами array: время в секундах ('q'), поле ('B') и код значения ('B').
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.columns: Dict[int, Columns] = {}
+        self._pending: List[bytes] = []
+
+    def exists(self) -> bool:
+        """Проверяет, есть ли файл истории"""
+        return os.path.exists(history_filename(self.filename))
+
+    def load(self):
+        """Загружает историю из файла"""
+        self.columns = {}
+        self._pending = []
+        try:
+            with open(history_filename(self.filename), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # Недописанный хвост (например, после сбоя) отбрасываем
+        data = data[:len(data) - len(data) % RECORD.size]
+        for task_id, timestamp, field, value in RECORD.iter_unpack(data):
+            self._append(task_id, timestamp, field, value)
+
+    def _append(self, task_id: int, timestamp: int, field: int, value: int):
+        columns = self.columns.get(task_id)
+        if columns is None:
+            columns = (array('q'), array('B'), array('B'))
+            self.columns[task_id] = columns
+        columns[0].append(timestamp)
+        columns[1].append(field)
+        columns[2].append(value)
+
+    def record(self, task_id: int, field: int, value: str, when: Optional[datetime] = None):
+        """Добавляет изменение; на диск оно попадет при flush()"""
+        record = pack_record(task_id, field, value, when or datetime.now())
+        self._append(*RECORD.unpack(record))
+        self._pending.append(record)
+
+    def seed(self, tasks: Iterable):
+        """Заполняет историю по полям задач, для которых журнала еще нет.
+
+        Для каждой задачи записывается создание в статусе todo и, если
+        статус другой, переход в текущий статус в момент последнего обновления.
+        """
+        for task in tasks:
+            self.record(task.id, FIELD_STATUS, "todo", task.created_at)
+            self.record(task.id, FIELD_PRIORITY, task.priority, task.created_at)
+            if task.status != "todo":
+                self.record(task.id, FIELD_STATUS, task.status, task.updated_at)
+
+    def flush(self):
+        """Дописывает накопленные изменения в файл"""
+        append_records(self.filename, self._pending)
+        self._pending = []
@@ -1,28 +1,48 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from __future__ import annotations
+
 import sys
 import io
+from typing import TYPE_CHECKING, Iterable
 
 # Настройка UTF-8 для Windows консоли
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-from storage import Storage
+if TYPE_CHECKING:
+    from storage import Storage
 
+# Хранилище загружается только в интерактивном режиме; быстрые команды
+# работают через индекс и не импортируют storage, csv и прочее
+TASKS_FILE = "tasks.json"
 
-def list_tasks(storage: Storage):
-    """Показывает список всех задач"""
-    tasks = storage.list_tasks()
 
-    if not tasks:
-        print("\nЗадач пока нет!")
-        return
+def print_tasks(tasks: Iterable, title: str, empty_message: str):
+    """Печатает задачи под заголовком; принимает и списки, и итераторы.
 
-    print("\n=== Список задач ===")
-    for task in tasks:
-        print(task)
+    Элементами могут быть задачи или пары (хранилище, задача) из StoreSet.
+    """
+    found = False
+    for item in tasks:
+        if not found:
+            print(f"\n=== {title} ===")
+            found = True
+        if isinstance(item, tuple):
+            store_name, task = item
+            print(f"\n[{store_name}]{task}")
+        else:
+            print(item)
+
+    if not found:
+        print(f"\n{empty_message}")
+
+
+def list_tasks(storage: Storage):
+    """Показывает список всех задач"""
+    print_tasks(storage.list_tasks(), "Список задач", "Задач пока нет!")
 
 
 def add_task(storage: Storage):
@@ -67,7 +87,8 @@ def update_task(storage: Storage):
         print("Некорректный ID!")
         return
 
-    task = storage.get_task(task_id)
+    # Архивная задача возвращается в активные, иначе изменения не сохранятся
+    task = storage.get_editable_task(task_id)
     if not task:
         print("Задача не найдена!")
         return
@@ -81,6 +102,7 @@ def update_task(storage: Storage):
     print("4. Дедлайн")
     print("5. Теги")
     print("6. Всё сразу")
+    print("7. Связи (блокирующие и родительская задачи)")
 
     option = input("\nВыберите опцию: ").strip()
 
@@ -89,7 +111,7 @@ def update_task(storage: Storage):
         title = input("Новое название (Enter - оставить): ").strip()
         print(f"Текущее описание: {task.description}")
         description = input("Новое описание (Enter - оставить): ").strip()
-        task.update(title if title else None, description if description else None)
+        storage.update_task(task.id, title if title else None, description if description else None)
 
     elif option == "2":
         print(f"\nТекущий статус: {task.status}")
@@ -100,7 +122,7 @@ def update_task(storage: Storage):
                       "todo": "todo", "in_progress": "in_progress", "done": "done"}
         status = status_map.get(status_input)
         if status:
-            task.update_status(status)
+            storage.update_status(task.id, status)
         else:
             print("Некорректный статус!")
             return
@@ -114,7 +136,7 @@ def update_task(storage: Storage):
                         "low": "low", "medium": "medium", "high": "high"}
         priority = priority_map.get(priority_input)
         if priority:
-            task.update_priority(priority)
+            storage.update_priority(task.id, priority)
         else:
             print("Некорректный приоритет!")
             return
@@ -132,7 +154,7 @@ def update_task(storage: Storage):
         deadline_input = input("Дедлайн: ").strip()
 
         if not deadline_input:
-            task.update_deadline(None)
+            storage.update_deadline(task.id, None)
         else:
             try:
                 # Пытаемся распарсить с временем
@@ -142,7 +164,7 @@ def update_task(storage: Storage):
                     # Если только дата, устанавливаем время 23:59
                     deadline = datetime.strptime(deadline_input, "%d.%m.%Y")
                     deadline = deadline.replace(hour=23, minute=59)
-                task.update_deadline(deadline)
+                storage.update_deadline(task.id, deadline)
             except ValueError:
                 print("Некорректный формат даты!")
                 return
@@ -158,10 +180,10 @@ def update_task(storage: Storage):
         tags_input = input("Теги: ").strip()
 
         if not tags_input:
-            task.set_tags([])
+            storage.set_tags(task.id, [])
         else:
             tags = [t.strip() for t in tags_input.split(",")]
-            task.set_tags(tags)
+            storage.set_tags(task.id, tags)
 
     elif option == "6":
         # Название и описание
@@ -169,7 +191,7 @@ def update_task(storage: Storage):
         title = input("Новое название (Enter - оставить): ").strip()
         print(f"Текущее описание: {task.description}")
         description = input("Новое описание (Enter - оставить): ").strip()
-        task.update(title if title else None, description if description else None)
+        storage.update_task(task.id, title if title else None, description if description else None)
 
         # Статус
         print(f"\nТекущий статус: {task.status}")
@@ -180,7 +202,7 @@ def update_task(storage: Storage):
                           "todo": "todo", "in_progress": "in_progress", "done": "done"}
             status = status_map.get(status_input)
             if status:
-                task.update_status(status)
+                storage.update_status(task.id, status)
 
         # Приоритет
         print(f"\nТекущий приоритет: {task.priority}")
@@ -191,7 +213,7 @@ def update_task(storage: Storage):
                             "low": "low", "medium": "medium", "high": "high"}
             priority = priority_map.get(priority_input)
             if priority:
-                task.update_priority(priority)
+                storage.update_priority(task.id, priority)
 
         # Дедлайн
         from datetime import datetime
@@ -203,7 +225,7 @@ def update_task(storage: Storage):
         deadline_input = input("Дедлайн (Enter - оставить): ").strip()
         if deadline_input:
             if deadline_input.lower() == "удалить":
-                task.update_deadline(None)
+                storage.update_deadline(task.id, None)
             else:
                 try:
                     if " " in deadline_input:
@@ -211,7 +233,7 @@ def update_task(storage: Storage):
                     else:
                         deadline = datetime.strptime(deadline_input, "%d.%m.%Y")
                         deadline = deadline.replace(hour=23, minute=59)
-                    task.update_deadline(deadline)
+                    storage.update_deadline(task.id, deadline)
                 except ValueError:
                     print("Некорректный формат даты! Дедлайн не обновлен.")
 
@@ -224,10 +246,54 @@ def update_task(storage: Storage):
         tags_input = input("Теги: ").strip()
         if tags_input:
             if tags_input.lower() == "удалить":
-                task.set_tags([])
+                storage.set_tags(task.id, [])
             else:
                 tags = [t.strip() for t in tags_input.split(",")]
-                task.set_tags(tags)
+                storage.set_tags(task.id, tags)
+
+    elif option == "7":
+        # Связи
+        if task.blocked_by:
+            print(f"\nБлокирующие задачи: {', '.join(['#' + str(i) for i in task.blocked_by])}")
+        else:
+            print("\nБлокирующих задач нет")
+        print("Введите ID блокирующих задач через запятую (Enter - оставить, 'удалить' - очистить)")
+        blockers_input = input("Блокеры: ").strip()
+        print(f"Родительская задача: {'#' + str(task.parent_id) if task.parent_id else 'нет'}")
+        parent_input = input("ID родительской задачи (Enter - оставить, 0 - убрать): ").strip()
+
+        try:
+            blockers = None
+            if blockers_input:
+                blockers = [] if blockers_input.lower() == "удалить" else \
+                    [int(i.strip().lstrip('#')) for i in blockers_input.split(",") if i.strip()]
+            parent_id = int(parent_input.lstrip('#')) if parent_input else None
+        except ValueError:
+            print("Некорректный ID!")
+            return
+
+        # Сначала проверяем все ID и циклы, чтобы не применить изменения частично
+        try:
+            for blocker_id in blockers or []:
+                storage.check_dependency(task.id, blocker_id)
+            if parent_id is not None:
+                storage.check_parent(task.id, parent_id or None)
+        except ValueError as e:
+            print(f"Ошибка: {e}!")
+            return
+
+        try:
+            if blockers is not None:
+                for blocker_id in list(task.blocked_by):
+                    if blocker_id not in blockers:
+                        storage.remove_dependency(task.id, blocker_id)
+                for blocker_id in blockers:
+                    storage.add_dependency(task.id, blocker_id)
+            if parent_id is not None:
+                storage.set_parent(task.id, parent_id or None)
+        except ValueError as e:
+            print(f"Ошибка: {e}!")
+            return
 
     else:
         print("Некорректная опция!")
@@ -268,15 +334,9 @@ def filter_tasks(storage: Storage):
             print("Некорректный статус!")
             return
 
-        tasks = storage.filter_tasks_by_status(status)
-
-        if not tasks:
-            print(f"\nЗадач со статусом '{status}' не найдено!")
-            return
-
-        print(f"\n=== Задачи со статусом '{status}' ===")
-        for task in tasks:
-            print(task)
+        print_tasks(storage.filter_tasks_by_status(status),
+                    f"Задачи со статусом '{status}'",
+                    f"Задач со статусом '{status}' не найдено!")
 
     elif filter_type == "2":
         # Фильтрация по тегу
@@ -295,15 +355,9 @@ def filter_tasks(storage: Storage):
         # Убираем # если пользователь его ввел
         tag_input = tag_input.lstrip('#')
 
-        tasks = storage.filter_tasks_by_tag(tag_input)
-
-        if not tasks:
-            print(f"\nЗадач с тегом '#{tag_input}' не найдено!")
-            return
-
-        print(f"\n=== Задачи с тегом '#{tag_input}' ===")
-        for task in tasks:
-            print(task)
+        print_tasks(storage.filter_tasks_by_tag(tag_input),
+                    f"Задачи с тегом '#{tag_input}'",
+                    f"Задач с тегом '#{tag_input}' не найдено!")
 
     else:
         print("Некорректная опция!")
@@ -318,15 +372,9 @@ def search_tasks(storage: Storage):
         print("Запрос не может быть пустым!")
         return
 
-    tasks = storage.search_tasks(query)
-
-    if not tasks:
-        print(f"\nЗадачи, содержащие '{query}', не найдены!")
-        return
-
-    print(f"\n=== Результаты поиска для '{query}' ===")
-    for task in tasks:
-        print(task)
+    print_tasks(storage.search_tasks(query),
+                f"Результаты поиска для '{query}'",
+                f"Задачи, содержащие '{query}', не найдены!")
 
 
 def sort_tasks(storage: Storage):
@@ -358,12 +406,6 @@ def sort_tasks(storage: Storage):
         print("Некорректный вариант сортировки!")
         return
 
-    tasks = storage.sort_tasks(sort_by)
-
-    if not tasks:
-        print("\nЗадач пока нет!")
-        return
-
     sort_names = {
         "id": "ID",
         "created": "дате создания",
@@ -372,9 +414,77 @@ def sort_tasks(storage: Storage):
         "priority": "приоритету"
     }
 
-    print(f"\n=== Задачи, отсортированные по {sort_names[sort_by]} ===")
-    for task in tasks:
-        print(task)
+    print_tasks(storage.sort_tasks(sort_by),
+                f"Задачи, отсортированные по {sort_names[sort_by]}",
+                "Задач пока нет!")
+
+
+def ready_tasks(storage: Storage):
+    """Показывает задачи, готовые к работе, и заблокированные задачи"""
+    print_tasks(storage.get_ready_tasks(), "Готовы к работе", "Готовых к работе задач нет!")
+
+    blocked = storage.get_blocked_tasks()
+    if blocked:
+        print(f"\nЗаблокировано задач: {len(blocked)} "
+              f"({', '.join(['#' + str(t.id) for t in blocked])})")
+
+
+def show_chain(storage: Storage):
+    """Показывает цепочку зависимостей задачи в порядке выполнения"""
+    print()
+    try:
+        task_id = int(input("Введите ID задачи: ").strip())
+    except ValueError:
+        print("Некорректный ID!")
+        return
+
+    if not storage.get_task(task_id):
+        print("Задача не найдена!")
+        return
+
+    status_emoji = {"todo": "📋", "in_progress": "⚙️", "done": "✅"}
+    print(f"\n=== Цепочка зависимостей задачи #{task_id} ===")
+    for step, task in enumerate(storage.dependency_chain(task_id), 1):
+        print(f"{step}. #{task.id} {status_emoji.get(task.status, '❓')} {task.title}")
+
+    subtasks = storage.get_subtasks(task_id)
+    if subtasks:
+        print("\nПодзадачи:")
+        for task in subtasks:
+            print(f"  #{task.id} {status_emoji.get(task.status, '❓')} {task.title}")
+
+
+def show_analytics(storage: Storage):
+    """Показывает время выполнения, пропускную способность и задачи в работе"""
+    from analytics import collect_times, cycle_time_stats, format_duration, weekly_throughput, wip_ages
+
+    tasks = storage.list_tasks(include_archive=True)
+    # Архивные задачи, выполненные до появления журнала, дополняются по их полям
+    times = collect_times(storage.seed_history(tasks), tasks)
+
+    for group_by, group_name in (("priority", "приоритетам"), ("tag", "тегам")):
+        stats = cycle_time_stats(times, tasks, group_by)
+        print(f"\n=== Время выполнения по {group_name} ===")
+        if not stats:
+            print("Завершенных задач пока нет!")
+            continue
+        print("Группа: выполнено | lead медиана / p90 | cycle медиана / p90")
+        for group in sorted(stats):
+            row = stats[group]
+            print(f"{group}: {row['count']} | "
+                  f"{format_duration(row['lead_median'])} / {format_duration(row['lead_p90'])} | "
+                  f"{format_duration(row['cycle_median'])} / {format_duration(row['cycle_p90'])}")
+
+    print("\n=== Выполнено задач по неделям ===")
+    for week_start, count in weekly_throughput(times):
+        print(f"{week_start.strftime('%d.%m.%Y')}: {'█' * count} {count}")
+
+    print("\n=== Задачи в работе ===")
+    ages = wip_ages(times, tasks)
+    if not ages:
+        print("Задач в работе нет!")
+    for task, age in ages:
+        print(f"#{task.id} {task.title}: в работе {format_duration(age)}")
 
 
 def export_tasks(storage: Storage):
@@ -413,10 +523,234 @@ def export_tasks(storage: Storage):
         print("Некорректный формат!")
 
 
+def _load_storage():
+    """Загружает хранилище целиком; None, если файл задач поврежден"""
+    from storage import Storage
+
+    storage = Storage(TASKS_FILE, archive_after_days=None)
+    if not storage.load():
+        print("Файл задач не изменен, исправьте его вручную")
+        return None
+    return storage
+
+
+def _open_index():
+    """Открывает индекс файла задач для записи, при необходимости перестраивая его"""
+    from task_index import TaskIndex
+
+    index = TaskIndex.open(TASKS_FILE)
+    if index is None:
+        # Индекса нет или файл менялся в обход него: один раз пересохраняем,
+        # но только если файл удалось прочитать
+        storage = _load_storage()
+        if storage is None:
+            return None
+        storage.save()
+        index = TaskIndex.open(TASKS_FILE)
+    return index
+
+
+def fast_add(args: list) -> int:
+    """Добавляет задачу без загрузки остальных задач"""
+    title = args[0].strip() if args else ""
+    if not title:
+        print("Название не может быть пустым!")
+        return 1
+    description = args[1].strip() if len(args) > 1 else ""
+
+    index = _open_index()
+    if index is None:
+        return 1
+
+    from task import Task
+    task = Task(index.next_id, title, description)
+    try:
+        index.append_task(task.to_dict())
+        # Без журнала история будет восстановлена по задачам при полной загрузке
+        from history import FIELD_PRIORITY, FIELD_STATUS, TaskHistory, append_records, pack_record
+        if TaskHistory(TASKS_FILE).exists():
+            append_records(TASKS_FILE, [
+                pack_record(task.id, FIELD_STATUS, task.status, task.created_at),
+                pack_record(task.id, FIELD_PRIORITY, task.priority, task.created_at)
+            ])
+    except (OSError, ValueError) as e:
+        print(f"Ошибка сохранения данных: {e}")
+        return 1
+
+    print(f"✓ Задача #{task.id} успешно создана!")
+    return 0
+
+
+def fast_show(args: list) -> int:
+    """Показывает одну задачу, читая только ее"""
+    try:
+        task_id = int(args[0])
+    except (IndexError, ValueError):
+        print("Некорректный ID!")
+        return 1
+
+    # Команда только читает: без актуального индекса файл загружается целиком,
+    # но не пересохраняется
+    from task_index import TaskIndex
+    index = TaskIndex.open(TASKS_FILE)
+    if index is not None:
+        task_data = index.read_task(task_id)
+        if task_data is None:
+            from archive import Archive, archive_dirname
+            task_data = Archive(archive_dirname(TASKS_FILE)).read_task(task_id)
+        from task import Task
+        task = Task.from_dict(task_data) if task_data else None
+    else:
+        storage = _load_storage()
+        if storage is None:
+            return 1
+        task = storage.get_task(task_id, include_archive=True)
+
+    if task is None:
+        print("Задача не найдена!")
+        return 1
+    print(task)
+    return 0
+
+
+def fast_stats(args: list) -> int:
+    """Показывает количество активных задач по статусам из индекса"""
+    from task_index import STATUSES, TaskIndex
+    index = TaskIndex.open(TASKS_FILE)
+    if index is not None:
+        counts, next_id = index.counts, index.next_id
+    else:
+        storage = _load_storage()
+        if storage is None:
+            return 1
+        counts = {status: 0 for status in STATUSES}
+        for task in storage.tasks:
+            counts[task.status] = counts.get(task.status, 0) + 1
+        next_id = storage.next_id
+
+    print(f"Активных задач: {sum(counts.values())}")
+    for status, count in counts.items():
+        print(f"  {status}: {count}")
+    from archive import Archive, archive_dirname
+    print(f"В архиве: {Archive(archive_dirname(TASKS_FILE)).count()}")
+    print(f"Следующий ID: {next_id}")
+    return 0
+
+
+FAST_COMMANDS = {
+    "add": fast_add,
+    "show": fast_show,
+    "stats": fast_stats,
+}
+
+
+def run_command(args: list) -> int:
+    """Выполняет быструю команду из аргументов командной строки"""
+    return FAST_COMMANDS[args[0]](args[1:])
+
+
+def parse_options(args: list):
+    """Разбирает параметры интерактивного режима"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Менеджер задач. Быстрые команды: add НАЗВАНИЕ [ОПИСАНИЕ], show ID, stats")
+    parser.add_argument("--paged", metavar="КАТАЛОГ", nargs="?", const="tasks_pages",
+                        help="страничное хранилище в каталоге (по умолчанию tasks_pages)")
+    parser.add_argument("--page-size", type=int, default=100,
+                        help="число задач на странице для нового хранилища")
+    parser.add_argument("--cache-pages", type=int, default=8,
+                        help="сколько страниц держать в памяти")
+    parser.add_argument("--archive-after", metavar="ДНЕЙ", type=int, default=30,
+                        help="переносить в архив задачи, выполненные больше ДНЕЙ назад")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="не переносить задачи в архив при запуске")
+    parser.add_argument("--include-archive", action="store_true",
+                        help="показывать архивные задачи в списках, поиске и сортировке")
+    parser.add_argument("--workspace", metavar="ФАЙЛ", nargs="+",
+                        help="общий просмотр нескольких хранилищ (файлов или каталогов) только для чтения")
+    parser.add_argument("--keep-open", action="store_true",
+                        help="держать хранилища общего просмотра в памяти между командами")
+    return parser.parse_args(args)
+
+
+def open_storage(options):
+    """Создает и загружает хранилище согласно параметрам"""
+    if options.paged:
+        from paged_storage import PagedStorage
+        storage = PagedStorage(options.paged, options.page_size, options.cache_pages)
+        storage.load()
+    else:
+        from storage import Storage
+        storage = Storage(TASKS_FILE,
+                          archive_after_days=None if options.no_archive else options.archive_after,
+                          include_archive=options.include_archive)
+        storage.load()
+        archived = storage.archive_done_tasks()
+        if archived:
+            print(f"В архив перенесено выполненных задач: {archived}")
+    return storage
+
+
+def workspace_loop(store_set):
+    """Интерактивный просмотр нескольких хранилищ"""
+    print("=== Менеджер Задач: общий просмотр ===")
+    print("Хранилища: " + ", ".join(store_set.paths))
+
+    commands = {
+        "list": list_tasks,
+        "1": list_tasks,
+        "filter": filter_tasks,
+        "5": filter_tasks,
+        "search": search_tasks,
+        "6": search_tasks,
+        "sort": sort_tasks,
+        "7": sort_tasks,
+    }
+
+    while True:
+        print("\nКоманды:")
+        print("1. list - показать все задачи")
+        print("5. filter - фильтровать задачи по статусу или тегам")
+        print("6. search - поиск задач")
+        print("7. sort - сортировать задачи")
+        print("9. exit - выход")
+
+        command = input("\nВведите команду: ").strip()
+
+        if command in ["exit", "9"]:
+            print("До свидания!")
+            break
+
+        action = commands.get(command)
+        if action:
+            action(store_set)
+        else:
+            print("Неизвестная команда!")
+
+
 def main():
     """Основная функция программы"""
-    storage = Storage()
-    storage.load()
+    if len(sys.argv) > 1 and sys.argv[1] in FAST_COMMANDS:
+        sys.exit(run_command(sys.argv[1:]))
+
+    options = parse_options(sys.argv[1:])
+    if options.workspace:
+        from store_set import StoreSet
+        try:
+            store_set = StoreSet(options.workspace, include_archive=options.include_archive,
+                                 keep_open=options.keep_open)
+        except ValueError as e:
+            print(e)
+            sys.exit(2)
+        workspace_loop(store_set)
+        return
+
+    try:
+        storage = open_storage(options)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
 
     print("=== Менеджер Задач ===")
 
@@ -438,6 +772,16 @@ def main():
         "export": export_tasks,
         "8": export_tasks,
     }
+    # Связи и аналитика есть только у обычного хранилища
+    if not options.paged:
+        commands.update({
+            "ready": ready_tasks,
+            "10": ready_tasks,
+            "chain": show_chain,
+            "11": show_chain,
+            "analytics": show_analytics,
+            "12": show_analytics,
+        })
 
     while True:
         print("\nКоманды:")
@@ -450,10 +794,18 @@ def main():
         print("7. sort - сортировать задачи")
         print("8. export - экспортировать задачи")
         print("9. exit - выход")
+        if not options.paged:
+            print("10. ready - задачи, готовые к работе")
+            print("11. chain - цепочка зависимостей задачи")
+            print("12. analytics - время выполнения и пропускная способность")
 
         command = input("\nВведите команду: ").strip()
 
         if command in ["exit", "9"]:
+            if options.paged:
+                stats = storage.cache_stats()
+                print(f"Кэш страниц: попаданий {stats['hits']}, промахов {stats['misses']}, "
+                      f"вытеснений {stats['evictions']}, записей {stats['writebacks']}")
             print("До свидания!")
             break
 
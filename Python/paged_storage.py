@@ -0,0 +1,306 @@
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+from task import Task
+from storage import TaskExporter, sort_key
+
+PAGE_SIZE = 100
+CACHE_PAGES = 8
+META_FILENAME = "meta.json"
+LINKS_UNSUPPORTED = "Связи не поддерживаются в страничном режиме"
+
+
+class PagedStorage(TaskExporter):
+    """Хранилище задач, разбитое на страницы фиксированного размера.
+
+    Задача с ID n лежит на странице (n - 1) // page_size. В памяти держится
+    не больше cache_pages страниц (LRU), измененные страницы записываются
+    на диск при вытеснении и при save().
+
+    Объекты Task из get_task и list_tasks действительны, только пока их
+    страница в кэше: изменения после вытеснения теряются. Поэтому задачи
+    меняются через методы хранилища (update_status, update_task и т.д.),
+    которые заново получают страницу и помечают ее измененной.
+    """
+
+    def __init__(self, dirname: str = "tasks_pages", page_size: int = PAGE_SIZE,
+                 cache_pages: int = CACHE_PAGES):
+        if page_size < 1 or cache_pages < 1:
+            raise ValueError("Размер страницы и кэша должен быть положительным")
+        self.dirname = dirname
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.next_id = 1
+        self.pages: Set[int] = set()
+        self._cache: 'OrderedDict[int, Dict[int, Task]]' = OrderedDict()
+        # Отметки updated_at на момент загрузки: по ним находим задачи,
+        # измененные напрямую через методы Task
+        self._stamps: Dict[int, Dict[int, object]] = {}
+        self._dirty: Set[int] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+
+    def _meta_path(self) -> str:
+        return os.path.join(self.dirname, META_FILENAME)
+
+    def _page_path(self, page_no: int) -> str:
+        return os.path.join(self.dirname, f"page_{page_no:06d}.json")
+
+    def _page_no(self, task_id: int) -> int:
+        return (task_id - 1) // self.page_size
+
+    def load(self) -> bool:
+        """Загружает метаданные хранилища; возвращает False, если они повреждены.
+
+        Страницы читаются по требованию.
+        """
+        if not os.path.exists(self._meta_path()):
+            return True
+
+        try:
+            with open(self._meta_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                self.next_id = data.get("next_id", 1)
+                self.page_size = data.get("page_size", self.page_size)
+                self.pages = set(data.get("pages", []))
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"Ошибка загрузки данных: {e}")
+            self.next_id = 1
+            self.pages = set()
+            return False
+        finally:
+            self._cache.clear()
+            self._stamps.clear()
+            self._dirty.clear()
+        return True
+
+    def save(self):
+        """Записывает измененные страницы и метаданные"""
+        try:
+            os.makedirs(self.dirname, exist_ok=True)
+            for page_no in list(self._cache):
+                self._write_back(page_no)
+            data = {
+                "next_id": self.next_id,
+                "page_size": self.page_size,
+                "pages": sorted(self.pages)
+            }
+            with open(self._meta_path(), 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"Ошибка сохранения данных: {e}")
+
+    def _is_dirty(self, page_no: int) -> bool:
+        if page_no in self._dirty:
+            return True
+        stamps = self._stamps.get(page_no, {})
+        return any(stamps.get(task.id) != task.updated_at for task in self._cache[page_no].values())
+
+    def _write_back(self, page_no: int):
+        """Записывает страницу из кэша на диск, если она изменена"""
+        if not self._is_dirty(page_no):
+            return
+
+        page = self._cache[page_no]
+        path = self._page_path(page_no)
+        if page:
+            os.makedirs(self.dirname, exist_ok=True)
+            tasks_data = [page[task_id].to_dict() for task_id in sorted(page)]
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"tasks": tasks_data}, f, ensure_ascii=False, indent=2)
+            self.pages.add(page_no)
+        else:
+            if os.path.exists(path):
+                os.remove(path)
+            self.pages.discard(page_no)
+
+        self._stamps[page_no] = {task.id: task.updated_at for task in page.values()}
+        self._dirty.discard(page_no)
+        self.writebacks += 1
+
+    def _page(self, page_no: int) -> Dict[int, Task]:
+        """Возвращает страницу из кэша, при промахе читая ее с диска"""
+        page = self._cache.get(page_no)
+        if page is not None:
+            self._cache.move_to_end(page_no)
+            self.hits += 1
+            return page
+
+        self.misses += 1
+        page = {}
+        if page_no in self.pages:
+            with open(self._page_path(page_no), 'r', encoding='utf-8') as f:
+                for task_data in json.load(f).get("tasks", []):
+                    task = Task.from_dict(task_data)
+                    page[task.id] = task
+
+        self._cache[page_no] = page
+        self._stamps[page_no] = {task.id: task.updated_at for task in page.values()}
+        while len(self._cache) > self.cache_pages:
+            evicted = next(iter(self._cache))
+            self._write_back(evicted)
+            del self._cache[evicted]
+            self._stamps.pop(evicted, None)
+            self.evictions += 1
+        return page
+
+    def add_task(self, title: str, description: str) -> Task:
+        """Добавляет новую задачу"""
+        task = Task(self.next_id, title, description)
+        page_no = self._page_no(task.id)
+        self._page(page_no)[task.id] = task
+        self._dirty.add(page_no)
+        self.pages.add(page_no)
+        self.next_id += 1
+        return task
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Получает задачу по ID"""
+        page_no = self._page_no(task_id)
+        if task_id < 1 or page_no not in self.pages:
+            return None
+        return self._page(page_no).get(task_id)
+
+    def delete_task(self, task_id: int) -> bool:
+        """Удаляет задачу по ID"""
+        page_no = self._page_no(task_id)
+        if task_id < 1 or page_no not in self.pages:
+            return False
+        page = self._page(page_no)
+        if task_id not in page:
+            return False
+        del page[task_id]
+        self._dirty.add(page_no)
+        return True
+
+    def get_editable_task(self, task_id: int) -> Optional[Task]:
+        """Получает задачу для изменения; архива у страничного хранилища нет"""
+        return self.get_task(task_id)
+
+    def _edit(self, task_id: int) -> Optional[Task]:
+        """Возвращает задачу для изменения и помечает ее страницу измененной"""
+        task = self.get_task(task_id)
+        if task:
+            self._dirty.add(self._page_no(task_id))
+        return task
+
+    def update_task(self, task_id: int, title: Optional[str] = None,
+                    description: Optional[str] = None) -> bool:
+        """Обновляет название и описание задачи"""
+        task = self._edit(task_id)
+        if not task:
+            return False
+        task.update(title, description)
+        return True
+
+    def update_status(self, task_id: int, status: str) -> bool:
+        """Обновляет статус задачи"""
+        task = self._edit(task_id)
+        if not task:
+            return False
+        task.update_status(status)
+        return True
+
+    def update_priority(self, task_id: int, priority: str) -> bool:
+        """Обновляет приоритет задачи"""
+        task = self._edit(task_id)
+        if not task:
+            return False
+        task.update_priority(priority)
+        return True
+
+    def update_deadline(self, task_id: int, deadline: Optional[datetime]) -> bool:
+        """Обновляет дедлайн задачи"""
+        task = self._edit(task_id)
+        if not task:
+            return False
+        task.update_deadline(deadline)
+        return True
+
+    def set_tags(self, task_id: int, tags: List[str]) -> bool:
+        """Устанавливает теги задачи"""
+        task = self._edit(task_id)
+        if not task:
+            return False
+        task.set_tags(tags)
+        return True
+
+    def check_dependency(self, task_id: int, blocker_id: int):
+        """Связи между задачами в страничном режиме не поддерживаются"""
+        raise ValueError(LINKS_UNSUPPORTED)
+
+    def add_dependency(self, task_id: int, blocker_id: int):
+        """Связи между задачами в страничном режиме не поддерживаются"""
+        raise ValueError(LINKS_UNSUPPORTED)
+
+    def remove_dependency(self, task_id: int, blocker_id: int):
+        """Связи между задачами в страничном режиме не поддерживаются"""
+        raise ValueError(LINKS_UNSUPPORTED)
+
+    def check_parent(self, task_id: int, parent_id: Optional[int]):
+        """Связи между задачами в страничном режиме не поддерживаются"""
+        raise ValueError(LINKS_UNSUPPORTED)
+
+    def set_parent(self, task_id: int, parent_id: Optional[int]):
+        """Связи между задачами в страничном режиме не поддерживаются"""
+        raise ValueError(LINKS_UNSUPPORTED)
+
+    def list_tasks(self) -> Iterator[Task]:
+        """Перебирает все задачи по порядку ID, страница за страницей"""
+        for page_no in sorted(self.pages):
+            page = self._page(page_no)
+            for task_id in sorted(page):
+                yield page[task_id]
+
+    def filter_tasks_by_status(self, status: str) -> Iterator[Task]:
+        """Перебирает задачи с указанным статусом"""
+        return (task for task in self.list_tasks() if task.status == status)
+
+    def search_tasks(self, query: str) -> Iterator[Task]:
+        """Ищет задачи по тексту в названии или описании"""
+        query_lower = query.lower()
+        return (
+            task for task in self.list_tasks()
+            if query_lower in task.title.lower() or query_lower in task.description.lower()
+        )
+
+    def filter_tasks_by_tag(self, tag: str) -> Iterator[Task]:
+        """Перебирает задачи с указанным тегом"""
+        tag_lower = tag.lower().strip()
+        return (task for task in self.list_tasks() if tag_lower in task.tags)
+
+    def get_all_tags(self) -> List[str]:
+        """Возвращает список всех уникальных тегов"""
+        all_tags = set()
+        for task in self.list_tasks():
+            all_tags.update(task.tags)
+        return sorted(all_tags)
+
+    def sort_tasks(self, sort_by: str) -> Iterator[Task]:
+        """Перебирает задачи в порядке сортировки.
+
+        В памяти сортируются только пары (ключ, ID), сами задачи
+        подгружаются постранично при выдаче.
+        """
+        key, reverse = sort_key(sort_by)
+        if not key:
+            return self.list_tasks()
+
+        keys = [(key(task), task.id) for task in self.list_tasks()]
+        keys.sort(key=lambda item: item[0], reverse=reverse)
+        return (self.get_task(task_id) for _, task_id in keys)
+
+    def cache_stats(self) -> dict:
+        """Возвращает статистику кэша страниц"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "writebacks": self.writebacks,
+            "cached_pages": len(self._cache),
+            "capacity": self.cache_pages
+        }
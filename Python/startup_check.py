@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Проверка времени холодного старта быстрых команд.
+
+Запускает main.py через `python -X importtime` во временном каталоге
+и сравнивает суммарное время импортов с бюджетом. Также проверяет, что
+быстрый путь не тянет модули, нужные только интерактивному режиму.
+
+    python startup_check.py [БЮДЖЕТ_МС]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+STARTUP_BUDGET_MS = 60
+# Модули, которые не должны импортироваться быстрыми командами
+FORBIDDEN_MODULES = {"storage", "csv"}
+COMMANDS = [
+    ["add", "Проверка старта", "создана startup_check.py"],
+    ["show", "1"],
+    ["stats"],
+]
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Возвращает {модуль: (собственное время, накопленное время, вложенность)} в мкс"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure(args: list, cwd: str) -> dict:
+    """Запускает команду с -X importtime и разбирает вывод"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd, capture_output=True, text=True, encoding="utf-8"
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Команда {args} завершилась с кодом {result.returncode}:\n{result.stdout}")
+    return parse_importtime(result.stderr)
+
+
+def main() -> int:
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else STARTUP_BUDGET_MS
+    failed = False
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Модули самого интерпретатора (site, encodings, ...) не учитываем
+        baseline = measure(["-c", "pass"], workdir)
+        # Первый запуск создает файл задач и индекс, его не измеряем
+        measure([MAIN_PATH, "add", "Первая задача"], workdir)
+
+        for command in COMMANDS:
+            modules = measure([MAIN_PATH, *command], workdir)
+            total_us = sum(
+                cumulative for name, (_, cumulative, depth) in modules.items()
+                if depth == 0 and name not in baseline
+            )
+            forbidden = sorted(FORBIDDEN_MODULES & modules.keys())
+            ok = total_us / 1000 <= budget_ms and not forbidden
+            failed = failed or not ok
+
+            status = "OK" if ok else "FAIL"
+            print(f"[{status}] {command[0]}: импорты {total_us / 1000:.1f} мс "
+                  f"(бюджет {budget_ms:.0f} мс)")
+            if forbidden:
+                print(f"       лишние модули: {', '.join(forbidden)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
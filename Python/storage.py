@@ -1,116 +1,43 @@
 import json
 import os
-import csv
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from task import Task
+from task_index import write_store
+from dependencies import DependencyGraph
+from archive import Archive, archive_dirname
+from history import FIELD_PRIORITY, FIELD_STATUS, TaskHistory
 
+PRIORITY_ORDER = {"high": 1, "medium": 2, "low": 3}
+ARCHIVE_AFTER_DAYS = 30
 
-class Storage:
-    """Класс для управления хранением задач"""
 
-    def __init__(self, filename: str = "tasks.json"):
-        self.filename = filename
-        self.tasks: List[Task] = []
-        self.next_id = 1
-
-    def load(self):
-        """Загружает задачи из файла"""
-        if not os.path.exists(self.filename):
-            return
-
-        try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.next_id = data.get("next_id", 1)
-                tasks_data = data.get("tasks", [])
-                self.tasks = [Task.from_dict(task_data) for task_data in tasks_data]
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"Ошибка загрузки данных: {e}")
-            self.tasks = []
-            self.next_id = 1
-
-    def save(self):
-        """Сохраняет задачи в файл"""
-        try:
-            data = {
-                "next_id": self.next_id,
-                "tasks": [task.to_dict() for task in self.tasks]
-            }
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Ошибка сохранения данных: {e}")
-
-    def add_task(self, title: str, description: str) -> Task:
-        """Добавляет новую задачу"""
-        task = Task(self.next_id, title, description)
-        self.tasks.append(task)
-        self.next_id += 1
-        return task
-
-    def get_task(self, task_id: int) -> Optional[Task]:
-        """Получает задачу по ID"""
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
-
-    def delete_task(self, task_id: int) -> bool:
-        """Удаляет задачу по ID"""
-        for i, task in enumerate(self.tasks):
-            if task.id == task_id:
-                self.tasks.pop(i)
-                return True
-        return False
-
-    def list_tasks(self) -> List[Task]:
-        """Возвращает все задачи"""
-        return self.tasks
-
-    def filter_tasks_by_status(self, status: str) -> List[Task]:
-        """Возвращает задачи с указанным статусом"""
-        return [task for task in self.tasks if task.status == status]
-
-    def search_tasks(self, query: str) -> List[Task]:
-        """Ищет задачи по тексту в названии или описании"""
-        query_lower = query.lower()
-        return [
-            task for task in self.tasks
-            if query_lower in task.title.lower() or query_lower in task.description.lower()
-        ]
+def sort_key(sort_by: str) -> Tuple[Optional[Callable[[Task], Any]], bool]:
+    """Возвращает функцию ключа и признак обратного порядка для сортировки"""
+    if sort_by == "id":
+        return (lambda t: t.id), False
+    if sort_by == "created":
+        return (lambda t: t.created_at), False
+    if sort_by == "updated":
+        return (lambda t: t.updated_at), True
+    if sort_by == "status":
+        return (lambda t: t.status), False
+    if sort_by == "priority":
+        return (lambda t: PRIORITY_ORDER.get(t.priority, 2)), False
+    return None, False
 
-    def filter_tasks_by_tag(self, tag: str) -> List[Task]:
-        """Возвращает задачи с указанным тегом"""
-        tag_lower = tag.lower().strip()
-        return [task for task in self.tasks if tag_lower in task.tags]
 
-    def get_all_tags(self) -> List[str]:
-        """Возвращает список всех уникальных тегов"""
-        all_tags = set()
-        for task in self.tasks:
-            all_tags.update(task.tags)
-        return sorted(list(all_tags))
+class TaskExporter:
+    """Экспорт задач; по умолчанию экспортирует все задачи из list_tasks"""
 
-    def sort_tasks(self, sort_by: str) -> List[Task]:
-        """Сортирует и возвращает задачи по указанному критерию"""
-        tasks = self.tasks.copy()
-
-        if sort_by == "id":
-            tasks.sort(key=lambda t: t.id)
-        elif sort_by == "created":
-            tasks.sort(key=lambda t: t.created_at)
-        elif sort_by == "updated":
-            tasks.sort(key=lambda t: t.updated_at, reverse=True)
-        elif sort_by == "status":
-            tasks.sort(key=lambda t: t.status)
-        elif sort_by == "priority":
-            priority_order = {"high": 1, "medium": 2, "low": 3}
-            tasks.sort(key=lambda t: priority_order.get(t.priority, 2))
-
-        return tasks
+    def export_tasks(self) -> Iterable[Task]:
+        """Возвращает задачи для экспорта"""
+        return self.list_tasks()
 
     def export_to_csv(self, filename: str = "tasks.csv") -> bool:
         """Экспортирует задачи в CSV файл"""
+        import csv
+
         try:
             with open(filename, 'w', encoding='utf-8', newline='') as f:
                 writer = csv.writer(f)
@@ -119,7 +46,7 @@ class Storage:
                                 'Дедлайн', 'Теги', 'Создано', 'Обновлено'])
 
                 # Данные
-                for task in self.tasks:
+                for task in self.export_tasks():
                     deadline_str = task.deadline.strftime('%d.%m.%Y %H:%M') if task.deadline else ''
                     tags_str = ', '.join(['#' + t for t in task.tags]) if task.tags else ''
 
@@ -145,10 +72,6 @@ class Storage:
             with open(filename, 'w', encoding='utf-8') as f:
                 f.write("# Список задач\n\n")
 
-                if not self.tasks:
-                    f.write("*Задач нет*\n")
-                    return True
-
                 # Группируем по статусу
                 statuses = {
                     "todo": "📋 К выполнению",
@@ -156,9 +79,11 @@ class Storage:
                     "done": "✅ Выполнено"
                 }
 
+                has_tasks = False
                 for status, status_name in statuses.items():
-                    status_tasks = [t for t in self.tasks if t.status == status]
+                    status_tasks = [t for t in self.export_tasks() if t.status == status]
                     if status_tasks:
+                        has_tasks = True
                         f.write(f"## {status_name}\n\n")
                         for task in status_tasks:
                             # Приоритет
@@ -183,7 +108,392 @@ class Storage:
                             f.write(f"**Создано:** {task.created_at.strftime('%d.%m.%Y %H:%M')}  \n")
                             f.write(f"**Обновлено:** {task.updated_at.strftime('%d.%m.%Y %H:%M')}  \n")
                             f.write("\n---\n\n")
+
+                if not has_tasks:
+                    f.write("*Задач нет*\n")
             return True
         except Exception as e:
             print(f"Ошибка экспорта в Markdown: {e}")
             return False
+
+
+class Storage(TaskExporter):
+    """Класс для управления хранением задач.
+
+    Выполненные задачи старше archive_after_days переносятся в архив
+    (см. archive_done_tasks). Запросы по умолчанию работают только с
+    активными задачами; include_archive=True добавляет архивные.
+    """
+
+    def __init__(self, filename: str = "tasks.json", archive_after_days: Optional[int] = ARCHIVE_AFTER_DAYS,
+                 include_archive: bool = False):
+        self.filename = filename
+        self.tasks: List[Task] = []
+        # Активные задачи по ID; обновляется вместе с self.tasks
+        self.tasks_by_id: Dict[int, Task] = {}
+        self.next_id = 1
+        self.graph = DependencyGraph()
+        self.archive = Archive(archive_dirname(filename))
+        self.archive_after_days = archive_after_days
+        self.include_archive = include_archive
+        self._history = TaskHistory(filename)
+        self._history_loaded = False
+
+    def load(self) -> bool:
+        """Загружает задачи из файла; возвращает False, если файл поврежден"""
+        if not os.path.exists(self.filename):
+            return True
+
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                self.next_id = data.get("next_id", 1)
+                tasks_data = data.get("tasks", [])
+                self.tasks = [Task.from_dict(task_data) for task_data in tasks_data]
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"Ошибка загрузки данных: {e}")
+            self.tasks = []
+            self.tasks_by_id = {}
+            self.next_id = 1
+            self.graph = DependencyGraph()
+            return False
+
+        self.tasks_by_id = {task.id: task for task in self.tasks}
+
+        # Граф берется из файла, только если файл задач с тех пор не менялся
+        self.graph = DependencyGraph.open(self.filename) or DependencyGraph.build(self.tasks)
+        # ID архивных задач не должны выдаваться повторно
+        self.next_id = max(self.next_id, self.archive.max_id() + 1)
+        # Журнал читается при первом обращении к history
+        self._history = TaskHistory(self.filename)
+        self._history_loaded = False
+        return True
+
+    @property
+    def history(self) -> TaskHistory:
+        """Журнал изменений статуса и приоритета, загружаемый по требованию"""
+        if not self._history_loaded:
+            self._history_loaded = True
+            if self._history.exists():
+                self._history.load()
+            else:
+                # Журнала еще нет: восстанавливаем его по активным задачам.
+                # Архив здесь не читаем, архивные задачи дополняет seed_history
+                self._seed_missing(self.tasks)
+        return self._history
+
+    def _seed_missing(self, tasks: Iterable[Task]):
+        missing = [task for task in tasks if task.id not in self._history.columns]
+        if not missing:
+            return
+        self._history.seed(missing)
+        try:
+            self._history.flush()
+        except OSError as e:
+            print(f"Ошибка сохранения истории: {e}")
+
+    def seed_history(self, tasks: Iterable[Task]) -> TaskHistory:
+        """Возвращает журнал, дополненный задачами, которых в нем нет.
+
+        Так в историю попадают архивные задачи, выполненные до появления журнала.
+        """
+        history = self.history
+        self._seed_missing(tasks)
+        return history
+
+    def save(self) -> bool:
+        """Сохраняет задачи в файл; возвращает False при ошибке"""
+        try:
+            write_store(self.filename, self.next_id, [task.to_dict() for task in self.tasks])
+            self.graph.save(self.filename)
+            self._history.flush()
+        except Exception as e:
+            print(f"Ошибка сохранения данных: {e}")
+            return False
+        return True
+
+    def add_task(self, title: str, description: str) -> Task:
+        """Добавляет новую задачу"""
+        # Журнал загружается до изменений, иначе задача попала бы в него дважды
+        history = self.history
+        task = Task(self.next_id, title, description)
+        self.tasks.append(task)
+        self.tasks_by_id[task.id] = task
+        self.graph.add_task(task.id, task.status)
+        history.record(task.id, FIELD_STATUS, task.status, task.created_at)
+        history.record(task.id, FIELD_PRIORITY, task.priority, task.created_at)
+        self.next_id += 1
+        return task
+
+    def _query_tasks(self, include_archive: Optional[bool]) -> List[Task]:
+        """Возвращает активные задачи и, если запрошено, архивные"""
+        if include_archive is None:
+            include_archive = self.include_archive
+        if not include_archive:
+            return self.tasks
+
+        hot_ids = {task.id for task in self.tasks}
+        archived = [task for task in self.archive.load_tasks() if task.id not in hot_ids]
+        return sorted(self.tasks + archived, key=lambda t: t.id)
+
+    def get_task(self, task_id: int, include_archive: Optional[bool] = None) -> Optional[Task]:
+        """Получает задачу по ID"""
+        task = self.tasks_by_id.get(task_id)
+        if task:
+            return task
+
+        if include_archive is None:
+            include_archive = self.include_archive
+        if include_archive:
+            task_data = self.archive.read_task(task_id)
+            if task_data:
+                return Task.from_dict(task_data)
+        return None
+
+    def get_editable_task(self, task_id: int) -> Optional[Task]:
+        """Получает активную задачу для изменения.
+
+        Архивная задача сначала возвращается в активные: копия из get_task
+        с include_archive не сохраняется при save().
+        """
+        return self.get_task(task_id, include_archive=False) or self.restore_task(task_id)
+
+    def delete_task(self, task_id: int, include_archive: Optional[bool] = None) -> bool:
+        """Удаляет задачу по ID; с include_archive удаляет и архивную задачу"""
+        task = self.tasks_by_id.pop(task_id, None)
+        if task:
+            self.tasks.remove(task)
+        else:
+            if include_archive is None:
+                include_archive = self.include_archive
+            if not include_archive:
+                return False
+            try:
+                if not self.archive.remove_task(task_id):
+                    return False
+            except OSError as e:
+                print(f"Ошибка обновления архива: {e}")
+                return False
+
+        # Убираем ссылки на удаленную задачу из связанных задач, не меняя
+        # updated_at: иначе сбились бы сортировка и срок архивации
+        for dependent_id in self.graph.blocks.get(task_id, ()):
+            other = self.tasks_by_id.get(dependent_id)
+            if other and task_id in other.blocked_by:
+                other.blocked_by.remove(task_id)
+        for child_id in self.graph.children.get(task_id, ()):
+            other = self.tasks_by_id.get(child_id)
+            if other and other.parent_id == task_id:
+                other.parent_id = None
+        self.graph.remove_task(task_id)
+        return True
+
+    def update_task(self, task_id: int, title: Optional[str] = None,
+                    description: Optional[str] = None) -> bool:
+        """Обновляет название и описание задачи"""
+        task = self.get_editable_task(task_id)
+        if not task:
+            return False
+        task.update(title, description)
+        return True
+
+    def update_status(self, task_id: int, status: str) -> bool:
+        """Обновляет статус задачи и пересчитывает готовность зависимых"""
+        task = self.get_editable_task(task_id)
+        if not task:
+            return False
+        history = self.history
+        old_status = task.status
+        task.update_status(status)
+        self.graph.set_status(task_id, status)
+        if status != old_status:
+            history.record(task_id, FIELD_STATUS, status, task.updated_at)
+        return True
+
+    def update_priority(self, task_id: int, priority: str) -> bool:
+        """Обновляет приоритет задачи и записывает изменение в историю"""
+        task = self.get_editable_task(task_id)
+        if not task:
+            return False
+        history = self.history
+        old_priority = task.priority
+        task.update_priority(priority)
+        if priority != old_priority:
+            history.record(task_id, FIELD_PRIORITY, priority, task.updated_at)
+        return True
+
+    def update_deadline(self, task_id: int, deadline: Optional[datetime]) -> bool:
+        """Обновляет дедлайн задачи"""
+        task = self.get_editable_task(task_id)
+        if not task:
+            return False
+        task.update_deadline(deadline)
+        return True
+
+    def set_tags(self, task_id: int, tags: List[str]) -> bool:
+        """Устанавливает теги задачи"""
+        task = self.get_editable_task(task_id)
+        if not task:
+            return False
+        task.set_tags(tags)
+        return True
+
+    def check_dependency(self, task_id: int, blocker_id: int):
+        """Проверяет блокировку задачи task_id задачей blocker_id, ничего не меняя"""
+        if not self.get_task(task_id, include_archive=True) or not self.get_task(blocker_id, include_archive=True):
+            raise ValueError(f"Задача #{blocker_id} не найдена")
+        if task_id == blocker_id:
+            raise ValueError("Задача не может блокировать сама себя")
+        self.graph.check_dependency(task_id, blocker_id)
+
+    def add_dependency(self, task_id: int, blocker_id: int):
+        """Отмечает, что задача blocker_id блокирует задачу task_id"""
+        self.check_dependency(task_id, blocker_id)
+        task = self.get_editable_task(task_id)
+        self.graph.add_dependency(task_id, blocker_id)
+        task.add_blocker(blocker_id)
+
+    def remove_dependency(self, task_id: int, blocker_id: int):
+        """Удаляет блокировку задачи task_id задачей blocker_id"""
+        task = self.get_editable_task(task_id)
+        if not task:
+            raise ValueError("Задача не найдена")
+        self.graph.remove_dependency(task_id, blocker_id)
+        task.remove_blocker(blocker_id)
+
+    def check_parent(self, task_id: int, parent_id: Optional[int]):
+        """Проверяет назначение родительской задачи, ничего не меняя"""
+        if not self.get_task(task_id, include_archive=True):
+            raise ValueError(f"Задача #{task_id} не найдена")
+        if parent_id is not None and not self.get_task(parent_id, include_archive=True):
+            raise ValueError(f"Задача #{parent_id} не найдена")
+        self.graph.check_parent(task_id, parent_id)
+
+    def set_parent(self, task_id: int, parent_id: Optional[int]):
+        """Назначает родительскую задачу (None - убрать родителя)"""
+        self.check_parent(task_id, parent_id)
+        task = self.get_editable_task(task_id)
+        self.graph.set_parent(task_id, parent_id)
+        task.set_parent(parent_id)
+
+    def get_subtasks(self, task_id: int) -> List[Task]:
+        """Возвращает подзадачи задачи"""
+        return self._tasks_for_ids(self.graph.children.get(task_id, ()))
+
+    def _tasks_for_ids(self, task_ids: Iterable[int]) -> List[Task]:
+        """Возвращает активные задачи с указанными ID по порядку ID"""
+        return [self.tasks_by_id[i] for i in sorted(task_ids) if i in self.tasks_by_id]
+
+    def get_ready_tasks(self) -> List[Task]:
+        """Возвращает задачи todo, все блокеры которых выполнены"""
+        return self._tasks_for_ids(self.graph.ready)
+
+    def get_blocked_tasks(self) -> List[Task]:
+        """Возвращает невыполненные задачи с незавершенными блокерами"""
+        return self._tasks_for_ids(self.graph.blocked)
+
+    def dependency_chain(self, task_id: int) -> List[Task]:
+        """Возвращает задачу и все ее блокеры в порядке выполнения"""
+        return [self.tasks_by_id[i] for i in self.graph.chain(task_id) if i in self.tasks_by_id]
+
+    def list_tasks(self, include_archive: Optional[bool] = None) -> List[Task]:
+        """Возвращает все задачи"""
+        return self._query_tasks(include_archive)
+
+    def filter_tasks_by_status(self, status: str, include_archive: Optional[bool] = None) -> List[Task]:
+        """Возвращает задачи с указанным статусом"""
+        return [task for task in self._query_tasks(include_archive) if task.status == status]
+
+    def search_tasks(self, query: str, include_archive: Optional[bool] = None) -> List[Task]:
+        """Ищет задачи по тексту в названии или описании"""
+        query_lower = query.lower()
+        return [
+            task for task in self._query_tasks(include_archive)
+            if query_lower in task.title.lower() or query_lower in task.description.lower()
+        ]
+
+    def filter_tasks_by_tag(self, tag: str, include_archive: Optional[bool] = None) -> List[Task]:
+        """Возвращает задачи с указанным тегом"""
+        tag_lower = tag.lower().strip()
+        return [task for task in self._query_tasks(include_archive) if tag_lower in task.tags]
+
+    def get_all_tags(self, include_archive: Optional[bool] = None) -> List[str]:
+        """Возвращает список всех уникальных тегов"""
+        all_tags = set()
+        for task in self._query_tasks(include_archive):
+            all_tags.update(task.tags)
+        return sorted(list(all_tags))
+
+    def sort_tasks(self, sort_by: str, include_archive: Optional[bool] = None) -> List[Task]:
+        """Сортирует и возвращает задачи по указанному критерию"""
+        tasks = list(self._query_tasks(include_archive))
+
+        key, reverse = sort_key(sort_by)
+        if key:
+            tasks.sort(key=key, reverse=reverse)
+
+        return tasks
+
+    def export_tasks(self) -> List[Task]:
+        """Экспортирует все задачи, включая архивные"""
+        return self.list_tasks(include_archive=True)
+
+    def archive_done_tasks(self, now: Optional[datetime] = None) -> int:
+        """Переносит в архив задачи, выполненные больше archive_after_days дней назад"""
+        if self.archive_after_days is None:
+            return 0
+
+        threshold = (now or datetime.now()) - timedelta(days=self.archive_after_days)
+        old_tasks = [
+            task for task in self.tasks
+            if task.status == "done" and task.updated_at.replace(tzinfo=None) < threshold
+        ]
+        if not old_tasks:
+            return 0
+
+        try:
+            self.archive.add_segment(old_tasks)
+        except OSError as e:
+            print(f"Ошибка архивации: {e}")
+            return 0
+
+        archived_ids = {task.id for task in old_tasks}
+        self.tasks = [task for task in self.tasks if task.id not in archived_ids]
+        for task_id in archived_ids:
+            del self.tasks_by_id[task_id]
+        # Архивные блокеры считаются выполненными, поэтому граф просто перестраивается
+        self.graph = DependencyGraph.build(self.tasks)
+        self.save()
+        return len(old_tasks)
+
+    def restore_task(self, task_id: int) -> Optional[Task]:
+        """Возвращает задачу из архива в активные.
+
+        Сначала задача сохраняется в файл задач и только потом удаляется из
+        архива: после сбоя между этими шагами остается дубликат, а активная
+        копия имеет приоритет над архивной.
+        """
+        try:
+            task_data = self.archive.read_task(task_id)
+        except OSError as e:
+            print(f"Ошибка чтения архива: {e}")
+            return None
+        if not task_data:
+            return None
+
+        task = Task.from_dict(task_data)
+        self.tasks.append(task)
+        self.tasks.sort(key=lambda t: t.id)
+        self.tasks_by_id[task.id] = task
+        self.graph = DependencyGraph.build(self.tasks)
+        if not self.save():
+            self.tasks.remove(task)
+            del self.tasks_by_id[task.id]
+            self.graph = DependencyGraph.build(self.tasks)
+            return None
+
+        try:
+            self.archive.remove_task(task_id)
+        except OSError as e:
+            print(f"Ошибка обновления архива: {e}")
+        return task
@@ -0,0 +1,163 @@
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from task import Task
+from storage import Storage, sort_key
+from task_index import TaskIndex
+from archive import Archive, archive_dirname
+
+# Задача в наборе хранилищ идентифицируется парой (хранилище, ID)
+StoreKey = Tuple[str, int]
+StoreTask = Tuple[str, Task]
+
+
+class StoreSet:
+    """Объединенное представление нескольких хранилищ только для чтения.
+
+    Хранилища открываются лениво, при первом обращении. Списки, поиск и
+    фильтры выдаются потоком, хранилище за хранилищем; если keep_open=False
+    (по умолчанию), каждое хранилище выгружается сразу после обхода.
+    Для сортировки каждое хранилище отдает отсортированный список пар
+    (ключ, ID) и выгружается; списки сливаются k-путевым слиянием
+    (heapq.merge), а задачи читаются по одной при выдаче.
+    Каталог вместо файла открывается как страничное хранилище.
+    Несуществующий путь считается ошибкой, а не пустым хранилищем.
+    """
+
+    def __init__(self, paths: Iterable[str], include_archive: bool = False,
+                 keep_open: bool = False, max_workers: int = 4):
+        self.paths: List[str] = []
+        for path in paths:
+            path = os.path.normpath(path)
+            if not os.path.exists(path):
+                raise ValueError(f"Хранилище не найдено: {path}")
+            if path not in self.paths:
+                self.paths.append(path)
+        self.include_archive = include_archive
+        self.keep_open = keep_open
+        self.max_workers = max_workers
+        self._stores: Dict[str, object] = {}
+
+    def _load(self, path: str):
+        if os.path.isdir(path):
+            from paged_storage import PagedStorage
+            store = PagedStorage(path)
+        else:
+            # Представление только для чтения: архивацию при открытии не запускаем
+            store = Storage(path, archive_after_days=None, include_archive=self.include_archive)
+        store.load()
+        return store
+
+    def store(self, name: str):
+        """Возвращает хранилище по имени, открывая его при необходимости"""
+        if name not in self.paths:
+            raise KeyError(name)
+        store = self._stores.get(name)
+        if store is None:
+            store = self._load(name)
+            if self.keep_open:
+                self._stores[name] = store
+        return store
+
+    def open_all(self) -> Dict[str, object]:
+        """Открывает все хранилища параллельно"""
+        missing = [path for path in self.paths if path not in self._stores]
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                loaded = dict(zip(missing, executor.map(self._load, missing)))
+        else:
+            loaded = {}
+        stores = {path: self._stores.get(path) or loaded[path] for path in self.paths}
+        if self.keep_open:
+            self._stores.update(loaded)
+        return stores
+
+    def _labelled(self, name: str, tasks: Iterable[Task]) -> Iterator[StoreTask]:
+        for task in tasks:
+            yield name, task
+
+    def _stream(self, query: Callable[[object], Iterable[Task]]) -> Iterator[StoreTask]:
+        for name in self.paths:
+            yield from self._labelled(name, query(self.store(name)))
+
+    def get_task(self, key: StoreKey) -> Optional[Task]:
+        """Получает задачу по ключу (хранилище, ID)"""
+        name, task_id = key
+        return self.store(name).get_task(task_id)
+
+    def list_tasks(self) -> Iterator[StoreTask]:
+        """Перебирает задачи всех хранилищ"""
+        return self._stream(lambda store: store.list_tasks())
+
+    def filter_tasks_by_status(self, status: str) -> Iterator[StoreTask]:
+        """Перебирает задачи с указанным статусом"""
+        return self._stream(lambda store: store.filter_tasks_by_status(status))
+
+    def filter_tasks_by_tag(self, tag: str) -> Iterator[StoreTask]:
+        """Перебирает задачи с указанным тегом"""
+        return self._stream(lambda store: store.filter_tasks_by_tag(tag))
+
+    def search_tasks(self, query: str) -> Iterator[StoreTask]:
+        """Ищет задачи по тексту во всех хранилищах"""
+        return self._stream(lambda store: store.search_tasks(query))
+
+    def get_all_tags(self) -> List[str]:
+        """Возвращает список всех уникальных тегов"""
+        all_tags = set()
+        for name in self.paths:
+            all_tags.update(self.store(name).get_all_tags())
+        return sorted(all_tags)
+
+    def _sort_keys(self, name: str, key: Callable[[Task], Any], reverse: bool) -> List[Tuple[Any, int]]:
+        """Возвращает отсортированные пары (ключ, ID) задач хранилища"""
+        keys = [(key(task), task.id) for task in self.store(name).list_tasks()]
+        keys.sort(key=lambda item: item[0], reverse=reverse)
+        return keys
+
+    def _keyed(self, name: str, keys: List[Tuple[Any, int]]) -> Iterator[Tuple[Any, str, int]]:
+        for sort_value, task_id in keys:
+            yield sort_value, name, task_id
+
+    def _reader(self, name: str) -> Callable[[int], Optional[Task]]:
+        """Возвращает функцию чтения одной задачи хранилища по ID"""
+        if name in self._stores or os.path.isdir(name):
+            # Страничное хранилище держит в памяти только cache_pages страниц
+            return self.store(name).get_task
+
+        index = TaskIndex.open(name)
+        if index is None:
+            # Файл менялся в обход индекса: читаем хранилище целиком
+            return self._load(name).get_task
+
+        archive = Archive(archive_dirname(name))
+
+        def read(task_id: int) -> Optional[Task]:
+            task_data = index.read_task(task_id) or archive.read_task(task_id)
+            return Task.from_dict(task_data) if task_data else None
+        return read
+
+    def sort_tasks(self, sort_by: str) -> Iterator[StoreTask]:
+        """Перебирает задачи всех хранилищ в порядке сортировки.
+
+        При равных ключах задачи идут в порядке хранилищ, как при
+        сортировке одного хранилища.
+        """
+        key, reverse = sort_key(sort_by)
+        if not key:
+            return self.list_tasks()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            all_keys = list(executor.map(lambda name: self._sort_keys(name, key, reverse), self.paths))
+        streams = [self._keyed(name, keys) for name, keys in zip(self.paths, all_keys)]
+        return self._read_merged(heapq.merge(*streams, key=lambda item: item[0], reverse=reverse))
+
+    def _read_merged(self, merged: Iterator[Tuple[Any, str, int]]) -> Iterator[StoreTask]:
+        readers: Dict[str, Callable[[int], Optional[Task]]] = {}
+        for _, name, task_id in merged:
+            reader = readers.get(name)
+            if reader is None:
+                reader = readers[name] = self._reader(name)
+            task = reader(task_id)
+            if task is not None:
+                yield name, task
@@ -13,6 +13,8 @@ class Task:
         self.priority = "medium"  # low, medium, high
         self.deadline: Optional[datetime] = None
         self.tags: List[str] = []
+        self.blocked_by: List[int] = []  # ID задач, которые блокируют эту
+        self.parent_id: Optional[int] = None
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
 
@@ -64,6 +66,23 @@ class Task:
         self.tags = [t.strip().lower() for t in tags if t.strip()]
         self.updated_at = datetime.now()
 
+    def add_blocker(self, task_id: int):
+        """Добавляет блокирующую задачу"""
+        if task_id not in self.blocked_by:
+            self.blocked_by.append(task_id)
+            self.updated_at = datetime.now()
+
+    def remove_blocker(self, task_id: int):
+        """Удаляет блокирующую задачу"""
+        if task_id in self.blocked_by:
+            self.blocked_by.remove(task_id)
+            self.updated_at = datetime.now()
+
+    def set_parent(self, parent_id: Optional[int]):
+        """Устанавливает родительскую задачу"""
+        self.parent_id = parent_id
+        self.updated_at = datetime.now()
+
     def to_dict(self) -> dict:
         """Преобразует задачу в словарь"""
         return {
@@ -74,6 +93,8 @@ class Task:
             "priority": self.priority,
             "deadline": self.deadline.isoformat() if self.deadline else None,
             "tags": self.tags,
+            "blocked_by": self.blocked_by,
+            "parent_id": self.parent_id,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
@@ -100,6 +121,10 @@ class Task:
         # Обработка тегов
         task.tags = data.get("tags", [])
 
+        # Обработка связей
+        task.blocked_by = data.get("blocked_by", [])
+        task.parent_id = data.get("parent_id")
+
         return task
 
     def __str__(self) -> str:
@@ -131,12 +156,19 @@ class Task:
         if self.tags:
             tags_str = f"\nТеги: {', '.join(['#' + t for t in self.tags])}"
 
+        # Формирование строки связей
+        links_str = ""
+        if self.parent_id is not None:
+            links_str += f"\nРодительская задача: #{self.parent_id}"
+        if self.blocked_by:
+            links_str += f"\nЗаблокирована задачами: {', '.join(['#' + str(i) for i in self.blocked_by])}"
+
         return f"""
 ID: {self.id} {status_emoji.get(self.status, '❓')} {priority_emoji.get(self.priority, '⚪')}
 Название: {self.title}
 Описание: {self.description}
 Статус: {self.status}
-Приоритет: {self.priority}{deadline_str}{tags_str}
+Приоритет: {self.priority}{deadline_str}{tags_str}{links_str}
 Создано: {self.created_at.strftime('%d.%m.%Y %H:%M')}
 Обновлено: {self.updated_at.strftime('%d.%m.%Y %H:%M')}
 {'-' * 40}"""
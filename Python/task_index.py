@@ -0,0 +1,151 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+# Файл задач пишется в фиксированной раскладке: заголовок с next_id
+# фиксированной ширины, затем задачи через ",\n", затем хвост.
+# Это позволяет дописывать задачу и обновлять next_id без перезаписи файла.
+NEXT_ID_WIDTH = 12
+HEADER_PREFIX = '{\n  "next_id": '
+HEADER_SUFFIX = ',\n  "tasks": [\n'
+SEPARATOR = ',\n'
+TRAILER = '\n  ]\n}\n'
+
+INDEX_VERSION = 1
+STATUSES = ("todo", "in_progress", "done")
+
+
+def index_filename(filename: str) -> str:
+    """Возвращает имя файла-индекса для файла задач"""
+    return filename + ".idx"
+
+
+def _render_header(next_id: int) -> bytes:
+    return (HEADER_PREFIX + str(next_id).ljust(NEXT_ID_WIDTH) + HEADER_SUFFIX).encode('utf-8')
+
+
+def _render_task(task_data: dict) -> bytes:
+    text = json.dumps(task_data, ensure_ascii=False, indent=2)
+    return "\n".join("    " + line for line in text.split("\n")).encode('utf-8')
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {status: 0 for status in STATUSES}
+
+
+class TaskIndex:
+    """Индекс файла задач: next_id, счетчики по статусам и смещения задач.
+
+    Хранится рядом с файлом задач и позволяет читать одну задачу или
+    добавлять новую, не загружая остальные данные.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.next_id = 1
+        self.counts: Dict[str, int] = _empty_counts()
+        self.offsets: Dict[int, Tuple[int, int]] = {}
+        self.size = 0
+        self.mtime_ns = 0
+
+    @classmethod
+    def open(cls, filename: str) -> Optional['TaskIndex']:
+        """Открывает индекс; возвращает None, если его нет или он устарел"""
+        try:
+            with open(index_filename(filename), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            stat = os.stat(filename)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != INDEX_VERSION:
+            return None
+        # Файл задач мог быть изменен в обход индекса
+        if data.get("size") != stat.st_size or data.get("mtime_ns") != stat.st_mtime_ns:
+            return None
+
+        index = cls(filename)
+        index.next_id = data["next_id"]
+        index.counts.update(data.get("counts", {}))
+        index.offsets = {int(key): (offset, length) for key, (offset, length) in data["offsets"].items()}
+        index.size = stat.st_size
+        index.mtime_ns = stat.st_mtime_ns
+        return index
+
+    def save(self):
+        """Сохраняет индекс, привязывая его к текущему состоянию файла задач"""
+        stat = os.stat(self.filename)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        data = {
+            "version": INDEX_VERSION,
+            "next_id": self.next_id,
+            "counts": self.counts,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "offsets": {
+                str(task_id): [offset, length] for task_id, (offset, length) in self.offsets.items()
+            }
+        }
+        with open(index_filename(self.filename), 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    def read_task(self, task_id: int) -> Optional[dict]:
+        """Читает одну задачу по смещению"""
+        location = self.offsets.get(task_id)
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.filename, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length).decode('utf-8'))
+
+    def append_task(self, task_data: dict):
+        """Дописывает задачу в конец файла и обновляет next_id на месте"""
+        trailer = TRAILER.encode('utf-8')
+        payload = _render_task(task_data)
+
+        with open(self.filename, 'r+b') as f:
+            f.seek(-len(trailer), os.SEEK_END)
+            position = f.tell()
+            if f.read() != trailer:
+                raise ValueError("Файл задач имеет неожиданный формат")
+
+            f.seek(position)
+            if self.offsets:
+                f.write(SEPARATOR.encode('utf-8'))
+                position += len(SEPARATOR)
+            f.write(payload)
+            f.write(trailer)
+
+            self.next_id = max(self.next_id, task_data["id"] + 1)
+            f.seek(0)
+            f.write(_render_header(self.next_id))
+
+        self.offsets[task_data["id"]] = (position, len(payload))
+        self.counts[task_data["status"]] = self.counts.get(task_data["status"], 0) + 1
+        self.save()
+
+
+def write_store(filename: str, next_id: int, tasks_data: List[dict]) -> TaskIndex:
+    """Записывает файл задач в индексируемой раскладке вместе с индексом"""
+    index = TaskIndex(filename)
+    index.next_id = next_id
+
+    with open(filename, 'wb') as f:
+        header = _render_header(next_id)
+        f.write(header)
+        position = len(header)
+        for i, task_data in enumerate(tasks_data):
+            if i:
+                f.write(SEPARATOR.encode('utf-8'))
+                position += len(SEPARATOR)
+            payload = _render_task(task_data)
+            f.write(payload)
+            index.offsets[task_data["id"]] = (position, len(payload))
+            index.counts[task_data["status"]] = index.counts.get(task_data["status"], 0) + 1
+            position += len(payload)
+        f.write(TRAILER.encode('utf-8'))
+
+    index.save()
+    return index